@@ -62,12 +62,30 @@ REQUIRED_APIS=(
     "cloudresourcemanager.googleapis.com"
 )
 
-# Enable each API
+# Skip APIs that are already enabled (one list call instead of one check per API),
+# filtered server-side so only the required services are returned
+API_FILTER="config.name:($(IFS='|'; echo "${REQUIRED_APIS[*]}" | sed 's/|/ OR /g'))"
+ENABLED_APIS=$(gcloud services list --enabled --project=$PROJECT_ID \
+    --filter="$API_FILTER" --format="value(config.name)" 2>/dev/null)
+
+APIS_TO_ENABLE=()
 for api in "${REQUIRED_APIS[@]}"; do
-    echo "  Enabling $api..."
-    gcloud services enable $api --project=$PROJECT_ID --quiet
+    if grep -qxF "$api" <<< "$ENABLED_APIS"; then
+        echo "  $api already enabled"
+    else
+        APIS_TO_ENABLE+=("$api")
+    fi
 done
 
+# Enable the remaining APIs in a single batched request
+if [ ${#APIS_TO_ENABLE[@]} -gt 0 ]; then
+    echo "  Enabling ${APIS_TO_ENABLE[*]}..."
+    if ! gcloud services enable "${APIS_TO_ENABLE[@]}" --project=$PROJECT_ID --quiet; then
+        echo "❌ Error: Failed to enable one or more required APIs"
+        exit 1
+    fi
+fi
+
 echo "✅ All required APIs enabled"
 echo ""
 
@@ -7,22 +7,21 @@ It handles configuration, packaging, and deployment with password-based authenti
 """
 
 import os
+import re
 import sys
 import logging
 import argparse
+import threading
+import functools
+import hmac
+import json
 from typing import Optional, Dict, List, Any
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 
 # Add the current directory to Python path to import snow_agent
 sys.path.insert(0, str(Path(__file__).parent))
 
-from google.cloud import aiplatform
-import vertexai
-from vertexai import agent_engines
-from snow_agent.agent import create_servicenow_agent
-from dotenv import load_dotenv
-import copy
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,8 +29,85 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Matches ${VAR} references inside environment values
+_VAR_REF_RE = re.compile(r'\$\{[^}]+\}')
+
 # Store environment variables globally
 _env_vars = {}
+_ENV_LOADED = False
+_ENV_LOCK = threading.Lock()
+
+# Snapshot of os.environ taken once after the .env file is loaded
+_ENV_CACHE: Dict[str, str] = {}
+
+# List of environment variables to pass to the deployed agent
+ENV_VAR_KEYS = (
+    # ServiceNow Configuration
+    "SERVICENOW_INSTANCE_URL",
+    "SERVICENOW_USERNAME",
+    "SERVICENOW_ALLOWED_TABLES",
+    "SERVICENOW_API_TIMEOUT",
+    "SERVICENOW_MAX_RECORDS",
+
+    # Agent Configuration
+    "AGENT_NAME",
+    "AGENT_DISPLAY_NAME",
+    "AGENT_DESCRIPTION",
+    "AGENT_MODEL",
+    "AGENT_VERSION",
+
+    # Google Cloud Configuration (for reference)
+    "GOOGLE_CLOUD_PROJECT",
+    "GOOGLE_CLOUD_LOCATION",
+    "GOOGLE_GENAI_USE_VERTEXAI",
+
+    # Logging configuration
+    "ENVIRONMENT",
+    "LOG_LEVEL",
+)
+
+# Variables that must be set for a deployment to proceed
+REQUIRED_ENV_VARS = frozenset({
+    "GOOGLE_CLOUD_PROJECT",
+    "GOOGLE_CLOUD_LOCATION",
+    "SERVICENOW_INSTANCE_URL",
+    "SERVICENOW_USERNAME",
+    "SERVICENOW_PASSWORD",  # Required for Secret Manager setup
+})
+
+# Static values forced onto the loaded environment for production logging
+_ENV_TEMPLATE = MappingProxyType({
+    "ENVIRONMENT": "production",
+    "GOOGLE_GENAI_USE_VERTEXAI": "1",
+})
+
+# Values shorter than this are interned when loaded
+_INTERN_MAX_LEN = 32
+
+# Fallbacks for variables that must always be passed to the deployed agent
+_ENV_DEFAULTS = MappingProxyType({
+    "LOG_LEVEL": "INFO",
+})
+
+# Name fragments marking variables whose values are never written to disk caches
+_SECRET_ENV_MARKERS = ("PASSWORD", "SECRET", "TOKEN", "KEY")
+
+# Keys read from the environment; forced template values are never overridden
+_WANTED_ENV_KEYS = frozenset(ENV_VAR_KEYS).difference(_ENV_TEMPLATE)
+
+# Every key a deploy reads; .env is only skipped when all of them are exported
+_SKIP_DOTENV_KEYS = _WANTED_ENV_KEYS | REQUIRED_ENV_VARS
+
+# Variables injected by the Agent Engine runtime, excluded from deployment env
+_RUNTIME_ENV_KEYS = frozenset({"GOOGLE_CLOUD_PROJECT", "GOOGLE_CLOUD_LOCATION", "GOOGLE_GENAI_USE_VERTEXAI"})
+
+# Secret Manager reference for the ServiceNow password
+_DEPLOYMENT_ENV_TEMPLATE = MappingProxyType({
+    "SERVICENOW_PASSWORD": MappingProxyType({
+        "secret": "servicenow-password-prod",
+        "version": "latest",
+    }),
+})
 
 
 def clean_env_value(value: str) -> str:
@@ -42,14 +118,11 @@ def clean_env_value(value: str) -> str:
     original_value = value
     
     # Strip outer quotes if present
-    if (value.startswith('"') and value.endswith('"')) or \
-       (value.startswith("'") and value.endswith("'")):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
         value = value[1:-1]
     
     # Remove any ${VAR} references but keep the rest of the text
-    import re
-    # This regex removes ${...} patterns
-    value = re.sub(r'\$\{[^}]+\}', '', value)
+    value = _VAR_REF_RE.sub('', value)
     
     # Clean up any double spaces or trailing/leading spaces
     # But preserve single spaces between words
@@ -60,64 +133,163 @@ def clean_env_value(value: str) -> str:
     return value.strip()
 
 
+def _cache_dir() -> Path:
+    """Per-user cache directory for deploy-time lookups (outside the package)."""
+    cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "snow_agent"
+
+
+def _is_secret_env_key(key: str) -> bool:
+    """Return True for variables whose values must never be written to a cache."""
+    upper = key.upper()
+    return any(marker in upper for marker in _SECRET_ENV_MARKERS)
+
+
+def _write_private_json(path: Path, data: Any) -> None:
+    """Atomically write JSON readable only by the current user."""
+    import tempfile
+    
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # mkstemp creates the file with mode 0600 before anything is written to it
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _env_refs_digest(names: List[str]) -> str:
+    """Digest of the current values of the variables a .env file interpolates."""
+    import hashlib
+    
+    current = {name: os.environ.get(name) for name in names}
+    return hashlib.sha256(json.dumps(current, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_dotenv_cached(env_path: Path) -> None:
+    """Load a .env file, reusing a parsed JSON cache while the file is unchanged
+    
+    The cache lives in the user cache directory and never contains secret
+    values; if the file defines secrets that aren't already in the environment,
+    the file is parsed again so they can be loaded. Values interpolated from
+    ${VAR} references are only reused while those variables are unchanged.
+    """
+    import hashlib
+    from dotenv import dotenv_values
+    
+    env_path = Path(env_path)
+    if not env_path.is_file():
+        return
+    
+    path_digest = hashlib.sha256(str(env_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    cache_path = _cache_dir() / f"env-{path_digest}.json"
+    mtime = env_path.stat().st_mtime_ns
+    values = None
+    
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if (
+            cached.get("mtime") == mtime
+            and cached.get("refs_digest") == _env_refs_digest(cached.get("refs", []))
+            and all(key in os.environ for key in cached.get("secret_keys", []))
+        ):
+            values = cached.get("values")
+            logger.debug(f"Using cached environment from {cache_path}")
+    except (OSError, ValueError, AttributeError, TypeError):
+        pass
+    
+    if values is None:
+        raw_values = dotenv_values(env_path, interpolate=False)
+        values = {k: v for k, v in dotenv_values(env_path).items() if v is not None}
+        
+        # Variables referenced as ${NAME} or ${NAME:-default}
+        refs = {
+            ref[2:-1].split(":-", 1)[0]
+            for raw in raw_values.values() if raw
+            for ref in _VAR_REF_RE.findall(raw)
+        }
+        # Values expanded from a secret are as sensitive as the secret itself
+        secret_refs = {name for name in refs if _is_secret_env_key(name)}
+        secret_keys = sorted(
+            k for k in values
+            if _is_secret_env_key(k)
+            or any(f"${{{name}" in (raw_values.get(k) or "") for name in secret_refs)
+        )
+        # Secret references stay out of the digest; values using them aren't cached
+        public_refs = sorted(refs - secret_refs)
+        try:
+            _write_private_json(cache_path, {
+                "mtime": mtime,
+                "refs": public_refs,
+                "refs_digest": _env_refs_digest(public_refs),
+                "values": {k: v for k, v in values.items() if k not in secret_keys},
+                "secret_keys": secret_keys,
+            })
+        except OSError as e:
+            logger.debug(f"Could not write environment cache {cache_path}: {e}")
+    
+    # Match load_dotenv(): never override variables already set in the process
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+
+
+def _unquote(value: str) -> str:
+    """Strip any surrounding single or double quotes in one pass"""
+    return value.strip("\"'") if value else value
+
+
 def get_environment_variables(env_file: Optional[str] = None) -> Dict[str, str]:
     """Load and return environment variables from .env file"""
-    global _env_vars
+    global _ENV_CACHE, _ENV_LOADED
+    
+    if _ENV_LOADED:
+        return _env_vars
     
-    if not _env_vars:
+    with _ENV_LOCK:
+        if _ENV_LOADED:
+            return _env_vars
+        
         if env_file:
-            load_dotenv(env_file)
+            load_dotenv_cached(Path(env_file))
+        elif _SKIP_DOTENV_KEYS.issubset(os.environ):
+            # deploy.sh (or the host) already exported every wanted key; if only
+            # some are set, .env still fills in the rest without overriding them
+            logger.debug("Environment already populated, skipping .env file")
         else:
             # Load from snow_agent/.env
             env_path = Path(__file__).parent / "snow_agent" / ".env"
-            load_dotenv(env_path)
+            load_dotenv_cached(env_path)
         
-        # List of environment variables to pass to the deployed agent
-        env_var_keys = [
-            # ServiceNow Configuration
-            "SERVICENOW_INSTANCE_URL",
-            "SERVICENOW_USERNAME",
-            "SERVICENOW_ALLOWED_TABLES",
-            "SERVICENOW_API_TIMEOUT",
-            "SERVICENOW_MAX_RECORDS",
-            
-            # Agent Configuration
-            "AGENT_NAME",
-            "AGENT_DISPLAY_NAME",
-            "AGENT_DESCRIPTION",
-            "AGENT_MODEL",
-            "AGENT_VERSION",
-            
-            # Google Cloud Configuration (for reference)
-            "GOOGLE_CLOUD_PROJECT",
-            "GOOGLE_CLOUD_LOCATION",
-            "GOOGLE_GENAI_USE_VERTEXAI",
-            
-            # Logging configuration
-            "ENVIRONMENT",
-            "LOG_LEVEL",
-        ]
+        # Environment doesn't change after this point, so read it only once
+        _ENV_CACHE = dict(os.environ)
         
-        for key in env_var_keys:
-            if value := os.environ.get(key):
-                # For AGENT_NAME and AGENT_DESCRIPTION, be more careful with cleaning
-                if key in ["AGENT_NAME", "AGENT_DESCRIPTION"]:
-                    # Only clean if there are quotes or variable references
-                    if '"' in value or "'" in value or "${" in value:
-                        _env_vars[key] = clean_env_value(value)
-                    else:
-                        # Keep the value as-is, just strip whitespace
-                        _env_vars[key] = value.strip()
+        # Start from the forced production values so they are written only once
+        _env_vars.update(_ENV_TEMPLATE)
+        
+        # Walk the environment once, keeping only the wanted keys
+        for key, value in _ENV_CACHE.items():
+            if key in _WANTED_ENV_KEYS and value:
+                # Only clean if there are quotes or variable references
+                if '"' in value or "'" in value or "${" in value:
+                    value = clean_env_value(value)
                 else:
-                    # Clean other values normally
-                    _env_vars[key] = clean_env_value(value)
+                    # Keep the value as-is, just strip whitespace
+                    value = value.strip()
+                # Short values (flags, levels, regions) are shared across the deploy
+                _env_vars[key] = sys.intern(value) if len(value) < _INTERN_MAX_LEN else value
         
-        # Set production environment for proper logging
-        _env_vars["ENVIRONMENT"] = "production"
-        _env_vars["LOG_LEVEL"] = os.environ.get("LOG_LEVEL", "INFO")
-        _env_vars["GOOGLE_GENAI_USE_VERTEXAI"] = "1"
+        for key, value in _ENV_DEFAULTS.items():
+            _env_vars.setdefault(key, value)
         
-        logger.info(f"Loaded environment variables: {list(_env_vars.keys())}")
+        logger.info("Loaded environment variables: %s", _env_vars.keys())
+        _ENV_LOADED = True
     
     return _env_vars
 
@@ -126,15 +298,7 @@ def load_environment_variables(env_file: Optional[str] = None) -> None:
     """Load environment variables and validate required ones"""
     get_environment_variables(env_file)
     
-    required_vars = [
-        "GOOGLE_CLOUD_PROJECT",
-        "GOOGLE_CLOUD_LOCATION",
-        "SERVICENOW_INSTANCE_URL",
-        "SERVICENOW_USERNAME",
-        "SERVICENOW_PASSWORD",  # Required for Secret Manager setup
-    ]
-    
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    missing_vars = sorted(key for key in REQUIRED_ENV_VARS if not _ENV_CACHE.get(key))
     if missing_vars:
         logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
         sys.exit(1)
@@ -152,52 +316,83 @@ def get_extra_packages() -> List[str]:
     return ["snow_agent"]
 
 
+@functools.lru_cache(maxsize=1)
+def _reasoning_engines():
+    """Import vertexai.preview.reasoning_engines once, on first deploy"""
+    from vertexai.preview import reasoning_engines
+    
+    return reasoning_engines
+
+
+@functools.lru_cache(maxsize=1)
+def _secret_client():
+    """Return a shared Secret Manager client so the gRPC channel is set up once"""
+    from google.cloud import secretmanager
+    
+    return secretmanager.SecretManagerServiceClient()
+
+
+@functools.lru_cache(maxsize=1)
+def _projects_client():
+    """Return a shared Resource Manager client so the gRPC channel is set up once"""
+    from google.cloud import resourcemanager_v3
+    
+    return resourcemanager_v3.ProjectsClient()
+
+
 def create_secret_if_not_exists(project_id: str, secret_id: str, secret_value: str) -> None:
     """Create a secret in Secret Manager if it doesn't exist"""
+    from google.api_core import exceptions as gax_exceptions
     from google.cloud import secretmanager
     
-    client = secretmanager.SecretManagerServiceClient()
+    client = _secret_client()
+    payload_data = secret_value.encode("UTF-8")
+    # Typed messages skip the dict-to-proto conversion on each request
+    payload = secretmanager.SecretPayload(data=payload_data)
     parent = f"projects/{project_id}"
+    secret_name = f"{parent}/secrets/{secret_id}"
     
-    # Check if secret exists
+    # Check if secret exists; any failure other than NotFound is a real error
     try:
-        secret_name = f"{parent}/secrets/{secret_id}"
-        client.get_secret(request={"name": secret_name})
-        logger.info(f"Secret '{secret_id}' already exists")
-        
-        # Add a new version with the current value
-        client.add_secret_version(
-            request={
-                "parent": secret_name,
-                "payload": {"data": secret_value.encode("UTF-8")}
-            }
-        )
-        logger.info(f"Updated secret '{secret_id}' with new version")
-    except Exception:
+        client.get_secret(name=secret_name)
+    except gax_exceptions.NotFound:
         # Secret doesn't exist, create it
         try:
             client.create_secret(
-                request={
-                    "parent": parent,
-                    "secret_id": secret_id,
-                    "secret": {"replication": {"automatic": {}}},
-                }
+                parent=parent,
+                secret_id=secret_id,
+                secret=secretmanager.Secret(
+                    replication=secretmanager.Replication(
+                        automatic=secretmanager.Replication.Automatic()
+                    )
+                ),
             )
             
             # Add the secret version
-            secret_name = f"{parent}/secrets/{secret_id}"
-            client.add_secret_version(
-                request={
-                    "parent": secret_name,
-                    "payload": {"data": secret_value.encode("UTF-8")}
-                }
-            )
+            client.add_secret_version(parent=secret_name, payload=payload)
             logger.info(f"Created secret '{secret_id}' in Secret Manager")
         except Exception as e:
             logger.error(f"Failed to create secret '{secret_id}': {e}")
             raise
+        return
+    
+    logger.info(f"Secret '{secret_id}' already exists")
+    
+    # Skip writing a new version if the latest one already holds this value
+    try:
+        latest = client.access_secret_version(name=f"{secret_name}/versions/latest")
+        if hmac.compare_digest(latest.payload.data, payload_data):
+            logger.info(f"Secret '{secret_id}' is unchanged, skipping new version")
+            return
+    except gax_exceptions.GoogleAPICallError as e:
+        logger.debug(f"Could not read latest version of '{secret_id}': {type(e).__name__}")
+    
+    # Add a new version with the current value
+    client.add_secret_version(parent=secret_name, payload=payload)
+    logger.info(f"Updated secret '{secret_id}' with new version")
 
 
+@functools.lru_cache(maxsize=None)
 def get_service_account_email(project_id: str, location: str) -> str:
     """Get the service account email for the Agent Engine."""
     # The service account format for Agent Engine
@@ -205,55 +400,161 @@ def get_service_account_email(project_id: str, location: str) -> str:
     return f"service-{project_number}@gcp-sa-aiplatform-re.iam.gserviceaccount.com"
 
 
+def _project_number_cache_path() -> Path:
+    """Location of the on-disk project ID -> project number cache."""
+    return _cache_dir() / "project_numbers.json"
+
+
+@functools.lru_cache(maxsize=None)
 def get_project_number(project_id: str) -> str:
     """Get the project number from project ID."""
-    from google.cloud import resourcemanager_v3
-    
-    client = resourcemanager_v3.ProjectsClient()
+    # Project numbers never change, so a previously resolved value is always valid
+    cache_path = _project_number_cache_path()
+    cached: Dict[str, str] = {}
+    if cache_path.exists():
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if isinstance(cached.get(project_id), str):
+                return cached[project_id]
+        except (OSError, ValueError, AttributeError):
+            logger.debug(f"Ignoring unreadable project number cache: {cache_path}")
+            cached = {}
+    
+    client = _projects_client()
     project = client.get_project(name=f"projects/{project_id}")
-    return project.name.split('/')[-1]  # Extract project number from name
+    project_number = project.name.split('/')[-1]  # Extract project number from name
+    
+    try:
+        cached[project_id] = project_number
+        _write_private_json(cache_path, cached)
+    except OSError as e:
+        logger.debug(f"Could not write project number cache {cache_path}: {e}")
+    
+    return project_number
 
 
-def grant_secret_access(project_id: str, service_account_email: str, secret_id: str) -> None:
-    """Grant the service account access to the secret."""
-    from google.cloud import secretmanager
-    from google.iam.v1 import iam_policy_pb2, policy_pb2
+SECRET_ACCESSOR_ROLE = "roles/secretmanager.secretAccessor"
+
+# Last IAM policies confirmed by the server during this run and members still
+# to be written, per secret; cached policies are never modified in place
+_policy_cache: Dict[str, Any] = {}
+_pending_members: Dict[str, set] = {}
+
+
+def _has_accessor_member(policy: Any, member: str) -> bool:
+    """Return True if the policy's secretAccessor binding already contains member."""
+    return any(
+        b.role == SECRET_ACCESSOR_ROLE and member in b.members
+        for b in policy.bindings
+    )
+
+
+def _apply_accessor_members(policy: Any, members: set) -> bool:
+    """Add members to the secretAccessor binding of a policy; return True if changed."""
+    from google.iam.v1 import policy_pb2
+    
+    # Check if binding already exists
+    existing_binding = None
+    for b in policy.bindings:
+        if b.role == SECRET_ACCESSOR_ROLE:
+            existing_binding = b
+            break
+    
+    if existing_binding is None:
+        existing_binding = policy_pb2.Binding(role=SECRET_ACCESSOR_ROLE)
+        policy.bindings.append(existing_binding)
+    
+    changed = False
+    for member in sorted(members):
+        if member not in existing_binding.members:
+            existing_binding.members.append(member)
+            changed = True
+    return changed
+
+
+def add_secret_binding(project_id: str, secret_id: str, service_account_email: str) -> bool:
+    """Queue secretAccessor access for a service account; return True if a write is needed.
     
-    client = secretmanager.SecretManagerServiceClient()
+    The secret's policy is read once per run and changes are coalesced until
+    flush_secret_policies() writes them.
+    """
+    client = _secret_client()
     secret_name = f"projects/{project_id}/secrets/{secret_id}"
+    member = f"serviceAccount:{service_account_email}"
     
-    try:
-        # Get the current IAM policy
+    policy = _policy_cache.get(secret_name)
+    if policy is None:
         policy = client.get_iam_policy(request={"resource": secret_name})
+        _policy_cache[secret_name] = policy
+    
+    if _has_accessor_member(policy, member):
+        logger.info(f"{service_account_email} already has access to {secret_id}")
+        return False
+    
+    _pending_members.setdefault(secret_name, set()).add(member)
+    logger.info(f"Queued access for {service_account_email} to {secret_id}")
+    return True
+
+
+def flush_secret_policies(max_retries: int = 3, initial_delay: float = 1.0) -> None:
+    """Write all queued IAM policy changes, one set_iam_policy per secret.
+    
+    Each write carries the etag from the policy read, so a concurrent change
+    is rejected; on conflict the policy is re-read, the queued members are
+    re-applied and the write is retried with exponential backoff. Members are
+    applied to a copy of the cached policy, which is only replaced once the
+    write succeeds; if it fails, the cached policy and queued members for that
+    secret are dropped so a later grant re-reads the policy and retries cleanly.
+    """
+    import copy
+    import time
+    from google.api_core import exceptions as gax_exceptions
+    
+    client = _secret_client()
+    
+    for secret_name in list(_pending_members):
+        members = _pending_members[secret_name]
+        policy = copy.deepcopy(_policy_cache[secret_name])
+        delay = initial_delay
         
-        # Add the service account with secretAccessor role
-        binding = policy_pb2.Binding()
-        binding.role = "roles/secretmanager.secretAccessor"
-        binding.members.append(f"serviceAccount:{service_account_email}")
-        
-        # Check if binding already exists
-        existing_binding = None
-        for b in policy.bindings:
-            if b.role == binding.role:
-                existing_binding = b
-                break
-        
-        if existing_binding:
-            # Add member to existing binding if not already present
-            if f"serviceAccount:{service_account_email}" not in existing_binding.members:
-                existing_binding.members.append(f"serviceAccount:{service_account_email}")
-                logger.info(f"Added {service_account_email} to existing binding for {secret_id}")
-            else:
-                logger.info(f"{service_account_email} already has access to {secret_id}")
-        else:
-            # Add new binding
-            policy.bindings.append(binding)
-            logger.info(f"Created new binding for {service_account_email} to access {secret_id}")
-        
-        # Update the policy
-        client.set_iam_policy(request={"resource": secret_name, "policy": policy})
-        logger.info(f"Successfully granted Secret Manager access to {service_account_email}")
+        try:
+            if _apply_accessor_members(policy, members):
+                for attempt in range(max_retries + 1):
+                    try:
+                        policy = client.set_iam_policy(
+                            request={"resource": secret_name, "policy": policy}
+                        )
+                        break
+                    except (gax_exceptions.Aborted, gax_exceptions.FailedPrecondition) as e:
+                        if attempt >= max_retries:
+                            raise
+                        logger.warning(
+                            f"IAM policy for {secret_name} changed concurrently ({type(e).__name__}), "
+                            f"retrying in {delay} seconds..."
+                        )
+                        time.sleep(delay)
+                        delay *= 2
+                        policy = client.get_iam_policy(request={"resource": secret_name})
+                        if not _apply_accessor_members(policy, members):
+                            # Someone else already granted the same access
+                            break
+        except Exception:
+            _policy_cache.pop(secret_name, None)
+            del _pending_members[secret_name]
+            raise
         
+        _policy_cache[secret_name] = policy
+        del _pending_members[secret_name]
+        logger.info(f"Updated IAM policy for {secret_name}")
+
+
+def grant_secret_access(project_id: str, service_account_email: str, secret_id: str) -> None:
+    """Grant the service account access to the secret."""
+    try:
+        if add_secret_binding(project_id, secret_id, service_account_email):
+            flush_secret_policies()
+            logger.info(f"Successfully granted Secret Manager access to {service_account_email}")
     except Exception as e:
         logger.error(f"Failed to grant secret access: {e}")
         raise
@@ -266,12 +567,14 @@ def deploy_agent(
     display_name: Optional[str] = None,
 ) -> Any:
     """Deploy the agent to Vertex AI Agent Engine"""
+    # Heavy SDK imports are deferred so --help and argument validation stay fast
+    import vertexai
+    from vertexai import agent_engines
     
     if not staging_bucket:
         staging_bucket = f"gs://{project_id}-agent-staging"
     
-    # Initialize Vertex AI
-    aiplatform.init(project=project_id, location=location, staging_bucket=staging_bucket)
+    # Initialize Vertex AI (vertexai.init configures the shared aiplatform state too)
     vertexai.init(project=project_id, location=location, staging_bucket=staging_bucket)
     
     # Grant IAM permissions for the secret (secret is created by deploy.sh)
@@ -291,22 +594,17 @@ def deploy_agent(
     # Construct display name if not provided
     if not display_name:
         # Get values directly from environment
-        display_name = os.getenv("AGENT_NAME", "ServiceNow Agent")
-        
         # Strip quotes if present (since shell script preserves them)
-        display_name = display_name.strip('"').strip("'")
+        display_name = _unquote(os.getenv("AGENT_NAME", "ServiceNow Agent"))
         
         logger.info(f"AGENT_NAME from env: '{display_name}'")
     
     # Get description and append version
-    description = os.getenv("AGENT_DESCRIPTION", 
-                           "AI agent for managing ServiceNow records through natural language")
-    
     # Strip quotes if present
-    description = description.strip('"').strip("'")
+    description = _unquote(os.getenv("AGENT_DESCRIPTION", 
+                                     "AI agent for managing ServiceNow records through natural language"))
     
-    agent_version = os.getenv("AGENT_VERSION", "")
-    agent_version = agent_version.strip('"').strip("'")
+    agent_version = _unquote(os.getenv("AGENT_VERSION", ""))
     
     # Append version to description if available
     if agent_version:
@@ -315,12 +613,15 @@ def deploy_agent(
     logger.info(f"AGENT_VERSION from env: '{agent_version}'")
     
     # Log the final values for verification
-    logger.info(f"Final display_name: '{display_name}' (length: {len(display_name)} chars)")
-    logger.info(f"Final description: '{description}' (length: {len(description)} chars)")
+    # Lazy %-formatting so len() only runs when INFO is enabled
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Final display_name: '%s' (length: %d chars)", display_name, len(display_name))
+        logger.info("Final description: '%s' (length: %d chars)", description, len(description))
     
     logger.info(f"Deploying agent '{display_name}' to project '{project_id}' in location '{location}'")
     
-    from vertexai.preview import reasoning_engines
+    reasoning_engines = _reasoning_engines()
+    from snow_agent.agent import create_servicenow_agent
     
     # Get all environment variables
     env_vars = get_environment_variables()
@@ -335,17 +636,13 @@ def deploy_agent(
     # CRUCIAL: Call set_up() before deployment to prepare the app
     app.set_up()
     
-    # Create a copy of env_vars and remove special variables for deployment
-    deployment_env_vars = copy.deepcopy(env_vars)
-    # Remove these as they're set by the runtime
-    deployment_env_vars.pop("GOOGLE_CLOUD_PROJECT", None)
-    deployment_env_vars.pop("GOOGLE_CLOUD_LOCATION", None)
-    deployment_env_vars.pop("GOOGLE_GENAI_USE_VERTEXAI", None)
-    # Add Secret Manager reference for password
-    deployment_env_vars["SERVICENOW_PASSWORD"] = {
-        "secret": "servicenow-password-prod",
-        "version": "latest"
+    # Copy env_vars without the variables that are set by the runtime
+    deployment_env_vars = {
+        key: value for key, value in env_vars.items() if key not in _RUNTIME_ENV_KEYS
     }
+    # Add Secret Manager reference for password
+    for key, value in _DEPLOYMENT_ENV_TEMPLATE.items():
+        deployment_env_vars[key] = dict(value)
     
     # Deploy with proper parameters - matching oauth branch approach
     remote_agent = agent_engines.create(
@@ -362,13 +659,23 @@ def deploy_agent(
 
 def main():
     """Main function to handle command line arguments and deploy the agent"""
-    parser = argparse.ArgumentParser(description="Deploy ServiceNow Agent to Vertex AI Agent Engine")
-    parser.add_argument("--project-id", default=os.getenv("GOOGLE_CLOUD_PROJECT"))
-    parser.add_argument("--location", default=os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1"))
-    parser.add_argument("--staging-bucket", default=None)
-    parser.add_argument("--display-name", default=None)
-    parser.add_argument("--env-file", default=None)
-    args = parser.parse_args()
+    if len(sys.argv) == 1:
+        # Env-driven run with no CLI arguments: skip building the parser
+        args = SimpleNamespace(
+            project_id=os.getenv("GOOGLE_CLOUD_PROJECT"),
+            location=os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1"),
+            staging_bucket=None,
+            display_name=None,
+            env_file=None,
+        )
+    else:
+        parser = argparse.ArgumentParser(description="Deploy ServiceNow Agent to Vertex AI Agent Engine")
+        parser.add_argument("--project-id", default=os.getenv("GOOGLE_CLOUD_PROJECT"))
+        parser.add_argument("--location", default=os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1"))
+        parser.add_argument("--staging-bucket", default=None)
+        parser.add_argument("--display-name", default=None)
+        parser.add_argument("--env-file", default=None)
+        args = parser.parse_args()
     
     load_environment_variables(args.env_file)
     
@@ -12,50 +12,147 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import hashlib
+import hmac
 import logging
+import os
 import sys
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
 
 from google.adk import Agent
+from google.adk.tools import FunctionTool
 
-from .settings import ServiceNowSettings, AgentSettings
+from .settings import (
+    ServiceNowSettings,
+    AgentSettings,
+    get_servicenow_settings,
+    get_agent_settings,
+)
 from .servicenow_tool import create_servicenow_tool
-from .prompts import GLOBAL_INSTRUCTION, INSTRUCTION
+from .prompts import get_global_instruction, get_instruction
 
-# Configure logging to output to stdout with "ServiceNow Agent: " prefix
-# This ensures logs appear in Cloud Logging when deployed to Agent Engine
-# Set to DEBUG for detailed logging, or INFO for production
-import os
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level, logging.INFO),
-    format='ServiceNow Agent: %(levelname)s - %(name)s - %(message)s',
-    stream=sys.stdout,
-    force=True  # Force reconfiguration even if logging was already configured
-)
+logger = logging.getLogger(__name__)
 
-# Reduce noise from HTTP libraries
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
-logging.getLogger("urllib3").setLevel(logging.WARNING)
+_logging_configured = False
+
+
+def configure_logging() -> None:
+    """
+    Configure logging to output to stdout with "ServiceNow Agent: " prefix.
+    
+    This ensures logs appear in Cloud Logging when deployed to Agent Engine.
+    Set LOG_LEVEL to DEBUG for detailed logging, or INFO for production.
+    Runs once per process and only when the root agent is built, so merely
+    importing this module leaves the host application's logging untouched.
+    """
+    global _logging_configured
+    
+    if _logging_configured:
+        logger.debug("Logging already configured; skipping")
+        return
+    
+    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+    logging.basicConfig(
+        level=getattr(logging, log_level, logging.INFO),
+        format='ServiceNow Agent: %(levelname)s - %(name)s - %(message)s',
+        stream=sys.stdout,
+        force=True  # Force reconfiguration even if logging was already configured
+    )
+    
+    # Reduce noise from HTTP libraries
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
+    
+    _logging_configured = True
+
+
+# Deployed agents are unpickled without building root_agent, so configure
+# logging eagerly there to keep INFO logs flowing to Cloud Logging
+if os.getenv('ENVIRONMENT', 'development').lower() == 'production':
+    configure_logging()
+
+
+# Tools and agents already built in this process, keyed by the settings they
+# were built from; only the most recently used few are kept
+_SETTINGS_CACHE_MAXSIZE = 4
+_tool_cache: OrderedDict[Tuple, FunctionTool] = OrderedDict()
+_agent_cache: OrderedDict[Tuple, Agent] = OrderedDict()
+
+# Per-process key so cache keys hold a keyed digest of the password, never the password
+_PASSWORD_DIGEST_KEY = os.urandom(32)
+
+
+def _servicenow_settings_key(servicenow_settings: ServiceNowSettings) -> Tuple:
+    """Build a hashable key from the settings that affect tool construction."""
+    password = servicenow_settings.password
+    password_digest = hmac.new(
+        _PASSWORD_DIGEST_KEY, password.get_secret_value().encode("utf-8"), hashlib.sha256
+    ).hexdigest() if password else None
+    return (
+        servicenow_settings.instance_url,
+        servicenow_settings.username,
+        password_digest,
+        tuple(servicenow_settings.allowed_tables),
+        servicenow_settings.api_timeout,
+        servicenow_settings.max_records,
+    )
 
-logger = logging.getLogger(__name__)
+
+def _cache_get(cache: OrderedDict[Tuple, Any], key: Tuple) -> Any:
+    """Return a cached entry and mark it as most recently used."""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict[Tuple, Any], key: Tuple, value: Any) -> None:
+    """Store an entry, evicting the least recently used beyond the size limit."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _SETTINGS_CACHE_MAXSIZE:
+        cache.popitem(last=False)
+
+
+def _get_servicenow_tool(servicenow_settings: ServiceNowSettings, tool_key: Tuple) -> FunctionTool:
+    """Return the shared ServiceNow tool for these settings, creating it once."""
+    servicenow_tool = _cache_get(_tool_cache, tool_key)
+    if servicenow_tool is None:
+        servicenow_tool = create_servicenow_tool(servicenow_settings)
+        _cache_put(_tool_cache, tool_key, servicenow_tool)
+    return servicenow_tool
 
 
 def create_servicenow_agent(
     servicenow_settings: Optional[ServiceNowSettings] = None,
     agent_settings: Optional[AgentSettings] = None
 ) -> Agent:
-    """Create and configure the ServiceNow agent with NLP capabilities."""
+    """Create and configure the ServiceNow agent with NLP capabilities.
+    
+    Agents are memoized per settings, so repeated calls with equivalent
+    settings return the same instance instead of rebuilding it.
+    """
     
     # Load settings if not provided
-    if not servicenow_settings:
-        servicenow_settings = ServiceNowSettings()
-    if not agent_settings:
-        agent_settings = AgentSettings()
+    servicenow_settings = servicenow_settings or get_servicenow_settings()
+    agent_settings = agent_settings or get_agent_settings()
+    
+    tool_key = _servicenow_settings_key(servicenow_settings)
+    cache_key = tool_key + (
+        agent_settings.agent_name,
+        agent_settings.agent_description,
+        agent_settings.model,
+    )
+    cached_agent = _cache_get(_agent_cache, cache_key)
+    if cached_agent is not None:
+        logger.debug("Reusing previously created ServiceNow agent")
+        return cached_agent
     
-    # Create the ServiceNow tool
-    servicenow_tool = create_servicenow_tool(servicenow_settings)
+    # Create (or reuse) the ServiceNow tool
+    servicenow_tool = _get_servicenow_tool(servicenow_settings, tool_key)
     
     # Create the agent
     try:
@@ -63,12 +160,13 @@ def create_servicenow_agent(
             name=agent_settings.agent_name,
             model=agent_settings.model,
             description=agent_settings.agent_description,
-            global_instruction=GLOBAL_INSTRUCTION,
-            instruction=INSTRUCTION,
+            global_instruction=get_global_instruction(),
+            instruction=get_instruction(),
             tools=[servicenow_tool]
         )
         
         logger.info(f"ServiceNow agent created successfully with model: {agent_settings.model}")
+        _cache_put(_agent_cache, cache_key, agent)
         return agent
         
     except Exception as e:
@@ -76,6 +174,17 @@ def create_servicenow_agent(
         raise RuntimeError(f"Failed to create agent: {str(e)}")
 
 
+@functools.lru_cache(maxsize=1)
+def _unconfigured_agent(model: str) -> Agent:
+    """Return the shared placeholder agent used while configuration is missing."""
+    return Agent(
+        name="ServiceNow_Agent_Unconfigured",
+        model=model,
+        description="ServiceNow agent awaiting configuration",
+        instruction="I am a ServiceNow agent but I'm not yet configured. Please provide ServiceNow credentials and instance URL."
+    )
+
+
 # Lazy initialization pattern for the root agent
 _root_agent = None
 _root_agent_error = None
@@ -100,10 +209,12 @@ def get_root_agent() -> Agent:
         # Re-raise the cached error to avoid repeated initialization attempts
         raise _root_agent_error
     
+    configure_logging()
+    
     try:
         # Try to load settings from environment
-        servicenow_settings = ServiceNowSettings()
-        agent_settings = AgentSettings()
+        servicenow_settings = get_servicenow_settings()
+        agent_settings = get_agent_settings()
         _root_agent = create_servicenow_agent(servicenow_settings, agent_settings)
         logger.info("Root agent initialized successfully")
         return _root_agent
@@ -114,41 +225,25 @@ def get_root_agent() -> Agent:
         
         # Create a basic fallback agent if needed
         try:
-            agent_settings = AgentSettings()
+            agent_settings = get_agent_settings()
             model = agent_settings.model
-        except:
+        except Exception as settings_error:
+            logger.warning(f"Could not load agent settings, using default model: {settings_error}")
             model = "gemini-2.5-flash"
         
-        _root_agent = Agent(
-            name="ServiceNow_Agent_Unconfigured",
-            model=model,
-            description="ServiceNow agent awaiting configuration",
-            instruction="I am a ServiceNow agent but I'm not yet configured. Please provide ServiceNow credentials and instance URL."
-        )
+        _root_agent = _unconfigured_agent(model)
         return _root_agent
 
-# Create root_agent for Google ADK framework compatibility
-# The framework requires a module-level 'root_agent' variable that is an Agent instance
-# We need to create it at module level for the framework to find it
-try:
-    # Try to load settings from environment
-    _servicenow_settings = ServiceNowSettings()
-    _agent_settings = AgentSettings()
-    root_agent = create_servicenow_agent(_servicenow_settings, _agent_settings)
-    logger.info("Root agent created for Google ADK framework")
-except Exception as e:
-    # If configuration is missing, create a minimal agent
-    # This allows the module to be imported and the framework to load
-    logger.warning(f"Creating minimal agent due to missing configuration: {e}")
-    try:
-        _agent_settings = AgentSettings()
-        model = _agent_settings.model
-    except:
-        model = "gemini-2.5-flash"
+
+def __getattr__(name: str):
+    """Build root_agent on first access instead of at import time.
     
-    root_agent = Agent(
-        name="ServiceNow_Agent",
-        model=model,
-        description="ServiceNow agent awaiting configuration",
-        instruction="I am a ServiceNow agent but I'm not yet configured. Please provide ServiceNow credentials and instance URL."
-    )
+    The Google ADK framework looks up a module-level 'root_agent' attribute;
+    resolving it lazily keeps importing this module free of settings
+    parsing and agent construction.
+    """
+    if name == "root_agent":
+        global root_agent
+        root_agent = get_root_agent()
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
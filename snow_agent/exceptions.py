@@ -1,6 +1,7 @@
 """
 Custom exception classes for ServiceNow agent.
 """
+from typing import Optional
 
 
 class ServiceNowError(Exception):
@@ -20,7 +21,11 @@ class ServiceNowAuthenticationError(ServiceNowError):
 
 class ServiceNowRateLimitError(ServiceNowError):
     """Exception raised when rate limit is exceeded."""
-    pass
+    
+    def __init__(self, *args, retry_after: Optional[float] = None):
+        super().__init__(*args)
+        # Seconds the server asked us to wait before retrying, if it said
+        self.retry_after = retry_after
 
 
 class ServiceNowValidationError(ServiceNowError):
@@ -1,36 +1,39 @@
 """
 Centralized logging configuration for ServiceNow agent.
 """
+import functools
 import logging
+import re
 import sys
 import os
-from typing import Optional
+from contextvars import ContextVar
+from typing import Callable, Optional
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class SensitiveDataFilter(logging.Filter):
     """Filter to prevent sensitive data from being logged."""
     
-    SENSITIVE_PATTERNS = [
+    SENSITIVE_PATTERNS = (
         'password', 'secret', 'token', 'key', 'auth',
         'credential', 'api_key', 'access_token', 'refresh_token'
-    ]
+    )
     
     def filter(self, record: logging.LogRecord) -> bool:
         """Filter out log records containing sensitive information."""
-        # Check the message
-        message = str(record.getMessage()).lower()
+        # Check the unformatted template for keywords; args are masked below
+        msg = record.msg
+        template = (msg if isinstance(msg, str) else str(msg)).lower()
+        if _contains_sensitive_keyword(template):
+            # Mask the sensitive parts
+            record.msg = self._mask_sensitive_data(record.msg)
         
-        # Check for sensitive patterns in the message
-        for pattern in self.SENSITIVE_PATTERNS:
-            if pattern in message:
-                # Mask the sensitive parts
-                record.msg = self._mask_sensitive_data(record.msg)
-        
-        # Check args if present
-        if hasattr(record, 'args') and record.args:
-            record.args = self._mask_args(record.args)
+        # Check args if present; mapping args can carry sensitive keys that
+        # never appear in the formatted message, so this is not gated
+        args = record.args
+        if args:
+            record.args = self._mask_args(args)
         
         return True
     
@@ -39,58 +42,92 @@ class SensitiveDataFilter(logging.Filter):
         if not isinstance(text, str):
             text = str(text)
         
-        # Replace common patterns
-        import re
-        
         # Mask passwords in URLs
-        text = re.sub(
-            r'(https?://[^:]+:)([^@]+)(@)',
-            r'\1***MASKED***\3',
-            text
-        )
+        text = _URL_PASSWORD_RE.sub(r'\1***MASKED***\3', text)
         
-        # Mask values after sensitive keys
-        for pattern in self.SENSITIVE_PATTERNS:
-            text = re.sub(
-                rf'({pattern}["\']?\s*[:=]\s*["\']?)([^"\',\s}}]+)',
-                r'\1***MASKED***',
-                text,
-                flags=re.IGNORECASE
-            )
+        # Mask values after sensitive keys, skipping the regex for keys that
+        # don't occur at all (a plain substring test is far cheaper)
+        lowered = text.lower()
+        for pattern, pattern_re in _SENSITIVE_VALUE_RES:
+            if pattern in lowered:
+                masked = pattern_re.sub(r'\1***MASKED***', text)
+                if masked != text:
+                    text = masked
+                    lowered = text.lower()
         
         return text
     
     def _mask_args(self, args):
         """Mask sensitive data in log arguments."""
+        # _SENSITIVE_KEYWORDS drops patterns subsumed by shorter ones, so each
+        # arg costs six C-level substring scans instead of nine
         if isinstance(args, dict):
-            masked = {}
-            for key, value in args.items():
-                if any(pattern in key.lower() for pattern in self.SENSITIVE_PATTERNS):
-                    masked[key] = "***MASKED***"
-                else:
-                    masked[key] = value
-            return masked
+            return {
+                key: "***MASKED***" if _contains_sensitive_keyword(str(key).lower()) else value
+                for key, value in args.items()
+            }
         elif isinstance(args, (list, tuple)):
             return tuple(
-                "***MASKED***" if any(
-                    pattern in str(arg).lower() 
-                    for pattern in self.SENSITIVE_PATTERNS
-                ) else arg
+                "***MASKED***" if _contains_sensitive_keyword(str(arg).lower()) else arg
                 for arg in args
             )
         return args
 
 
+# Masking patterns compiled once at import instead of on every log record
+# Keywords whose presence triggers masking; patterns containing another
+# pattern (e.g. 'api_key' contains 'key') add nothing to the check
+_SENSITIVE_KEYWORDS = tuple(
+    pattern for pattern in SensitiveDataFilter.SENSITIVE_PATTERNS
+    if not any(
+        other != pattern and other in pattern
+        for other in SensitiveDataFilter.SENSITIVE_PATTERNS
+    )
+)
+_URL_PASSWORD_RE = re.compile(r'(https?://[^:]+:)([^@]+)(@)')
+_SENSITIVE_VALUE_RES = tuple(
+    (pattern, re.compile(
+        rf'({pattern}["\']?\s*[:=]\s*["\']?)([^"\',\s}}]+)',
+        re.IGNORECASE
+    ))
+    for pattern in SensitiveDataFilter.SENSITIVE_PATTERNS
+)
+
+
+def _contains_sensitive_keyword(lowered: str) -> bool:
+    """Return True if the lowercased text contains any sensitive keyword."""
+    for keyword in _SENSITIVE_KEYWORDS:
+        if keyword in lowered:
+            return True
+    return False
+
+
+# The filter is stateless, so one instance is shared by every logger and handler
+_SENSITIVE_FILTER = SensitiveDataFilter()
+
+
 class StructuredFormatter(logging.Formatter):
     """Formatter for structured logging output."""
     
+    # (whole second, ISO prefix) of the last formatted timestamp
+    _timestamp_cache = (None, '')
+    
+    def _format_timestamp(self, created: float) -> str:
+        """Format a record's creation time as a naive UTC ISO timestamp."""
+        second = int(created)
+        cached_second, prefix = self._timestamp_cache
+        if cached_second != second:
+            prefix = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+            self._timestamp_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}"
+    
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as structured JSON for production."""
         log_obj = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': self._format_timestamp(record.created),
             'level': record.levelname,
             'logger': record.name,
-            'message': record.getMessage(),
+            'message': record.getMessage() if record.args else str(record.msg),
             'module': record.module,
             'function': record.funcName,
             'line': record.lineno
@@ -119,55 +156,94 @@ class ColoredFormatter(logging.Formatter):
     }
     RESET = '\033[0m'
     
+    # Colored level names built once instead of on every record
+    COLORED_LEVELNAMES = {
+        level: f"{color}{level}\033[0m" for level, color in COLORS.items()
+    }
+    
     def format(self, record: logging.LogRecord) -> str:
         """Add color to log output for better readability."""
-        if record.levelname in self.COLORS:
-            record.levelname = (
-                f"{self.COLORS[record.levelname]}{record.levelname}{self.RESET}"
-            )
-        return super().format(record)
+        levelname = record.levelname
+        record.levelname = self.COLORED_LEVELNAMES.get(levelname, levelname)
+        try:
+            return super().format(record)
+        finally:
+            # Keep ANSI codes out of other handlers that see the same record
+            record.levelname = levelname
+
+
+# Set once setup_logging() has configured logging for this process
+_logging_configured = False
+
+# Accepted LOG_LEVEL names and their numeric levels
+_LOG_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL,
+}
 
 
 def setup_logging(
     log_level: Optional[str] = None,
     log_format: Optional[str] = None,
     use_structured: bool = False,
-    use_colors: bool = True
+    use_colors: bool = True,
+    force: bool = False
 ) -> None:
     """
     Configure logging for the ServiceNow agent.
     
+    Only the first call configures logging; later calls are ignored (with a
+    debug message) unless force is set.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_format: Format string for logs
         use_structured: Use structured JSON logging (for production)
         use_colors: Use colored output (for development)
+        force: Reconfigure even if logging was already set up; without it,
+            the arguments of every call after the first are ignored
     """
+    global _logging_configured
+    
+    if _logging_configured and not force:
+        logging.getLogger(__name__).debug(
+            "setup_logging() called again without force=True; keeping existing configuration"
+        )
+        return
+    _logging_configured = True
+    
     # Determine log level
     if log_level is None:
         log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
     
-    # Validate log level
-    if log_level not in ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']:
+    # Validate log level and resolve its numeric value once
+    level = _LOG_LEVELS.get(log_level)
+    if level is None:
         log_level = 'INFO'
+        level = logging.INFO
     
     # Determine if we're in production
     is_production = os.getenv('ENVIRONMENT', 'development').lower() == 'production'
     
+    # Attach LogContext fields to every record
+    _install_context_factory()
+    
     # Create root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level))
+    root_logger.setLevel(level)
     
     # Remove existing handlers
     root_logger.handlers.clear()
     
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, log_level))
+    console_handler.setLevel(level)
     
     # Add sensitive data filter
-    sensitive_filter = SensitiveDataFilter()
-    console_handler.addFilter(sensitive_filter)
+    console_handler.addFilter(_SENSITIVE_FILTER)
     
     # Set formatter based on environment
     if use_structured or is_production:
@@ -192,31 +268,55 @@ def setup_logging(
     logger.info(f"Logging configured: level={log_level}, production={is_production}")
 
 
+# Noisy third-party loggers (mostly HTTP libraries)
+_NOISY_LOGGERS = (
+    'httpx',
+    'httpcore',
+    'urllib3',
+    'asyncio',
+    'google.auth',
+    'google.api_core'
+)
+
+# Third-party levels keyed by whether we're in DEBUG mode
+_THIRD_PARTY_LEVELS = {
+    True: {name: logging.INFO for name in _NOISY_LOGGERS},
+    False: {name: logging.WARNING for name in _NOISY_LOGGERS},
+}
+
+
 def configure_third_party_loggers(log_level: str) -> None:
     """Configure logging levels for third-party libraries."""
-    # Reduce noise from HTTP libraries
-    noisy_loggers = [
-        'httpx',
-        'httpcore',
-        'urllib3',
-        'asyncio',
-        'google.auth',
-        'google.api_core'
-    ]
-    
-    for logger_name in noisy_loggers:
-        logger = logging.getLogger(logger_name)
-        # Set to WARNING unless we're in DEBUG mode
-        if log_level == 'DEBUG':
-            logger.setLevel(logging.INFO)
-        else:
-            logger.setLevel(logging.WARNING)
+    # Set to WARNING unless we're in DEBUG mode
+    for logger_name, level in _THIRD_PARTY_LEVELS[log_level == 'DEBUG'].items():
+        logging.getLogger(logger_name).setLevel(level)
+
+
+def lazy_log(logger: logging.Logger, level: int, build_message: Callable[[], str]) -> None:
+    """
+    Log a message that is expensive to build only if the level is enabled.
+    
+    Use this instead of an f-string for messages that serialize payloads
+    (e.g. json.dumps of request or response data), so the work is skipped
+    entirely when the level is disabled.
+    
+    Args:
+        logger: Logger to emit on
+        level: Logging level (e.g. logging.DEBUG)
+        build_message: Zero-argument callable returning the message
+    """
+    if logger.isEnabledFor(level):
+        # stacklevel=2 attributes the record to our caller, not this helper
+        logger.log(level, build_message(), stacklevel=2)
 
 
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance with the sensitive data filter applied.
     
+    Results are cached per name, so the filter check runs once per logger.
+    
     Args:
         name: Logger name (usually __name__)
         
@@ -226,38 +326,57 @@ def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     
     # Ensure sensitive data filter is applied
-    if not any(isinstance(f, SensitiveDataFilter) for f in logger.filters):
-        logger.addFilter(SensitiveDataFilter())
+    if _SENSITIVE_FILTER not in logger.filters:
+        logger.addFilter(_SENSITIVE_FILTER)
     
     return logger
 
 
+# Fields attached to records logged inside a LogContext
+_log_context: ContextVar[dict] = ContextVar('log_context', default={})
+_context_factory_installed = False
+
+
+def _install_context_factory() -> None:
+    """Install the record factory that attaches LogContext fields, once."""
+    global _context_factory_installed
+    if _context_factory_installed:
+        return
+    _context_factory_installed = True
+    
+    old_factory = logging.getLogRecordFactory()
+    
+    def record_factory(*args, **kwargs):
+        record = old_factory(*args, **kwargs)
+        context = _log_context.get()
+        if context:
+            record.extra_fields = context
+        return record
+    
+    logging.setLogRecordFactory(record_factory)
+
+
 class LogContext:
     """Context manager for adding contextual information to logs."""
     
+    __slots__ = ('logger', 'context', '_tok')
+    
     def __init__(self, logger: logging.Logger, **context):
         self.logger = logger
         self.context = context
-        self.old_factory = None
+        self._tok = None
     
     def __enter__(self):
         """Enter the context and add contextual information."""
-        old_factory = logging.getLogRecordFactory()
-        context = self.context
-        
-        def record_factory(*args, **kwargs):
-            record = old_factory(*args, **kwargs)
-            record.extra_fields = context
-            return record
-        
-        logging.setLogRecordFactory(record_factory)
-        self.old_factory = old_factory
+        _install_context_factory()
+        self._tok = _log_context.set({**_log_context.get(), **self.context})
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Exit the context and restore the original factory."""
-        if self.old_factory:
-            logging.setLogRecordFactory(self.old_factory)
+        """Exit the context and restore the enclosing context."""
+        if self._tok is not None:
+            _log_context.reset(self._tok)
+            self._tok = None
 
 
 # Don't initialize logging on module import to avoid side effects
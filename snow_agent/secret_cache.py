@@ -0,0 +1,77 @@
+"""
+Process-wide cache for values fetched from Google Secret Manager.
+"""
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Name of the secret holding the ServiceNow password
+SERVICENOW_PASSWORD_SECRET_ID = "servicenow-password-prod"
+
+
+class CachedSecret:
+    """Secret Manager value fetched once and shared by all callers in the process."""
+
+    def __init__(self, secret_id: str):
+        self.secret_id = secret_id
+        self._value: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get_secret(self, failure_log_level: int = logging.DEBUG) -> Optional[str]:
+        """
+        Return the secret value, fetching it until a fetch succeeds.
+
+        Args:
+            failure_log_level: Level for messages explaining why the secret
+                could not be fetched
+
+        Returns:
+            The secret value, or None if it is unavailable
+        """
+        if self._value is not None:
+            return self._value
+
+        with self._lock:
+            # Another caller may have fetched the value while we waited
+            if self._value is None:
+                self._value = self._fetch(failure_log_level)
+            return self._value
+
+    def _fetch(self, failure_log_level: int) -> Optional[str]:
+        """Fetch the latest secret version from Google Secret Manager."""
+        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+        if not project_id:
+            logger.log(failure_log_level, "GOOGLE_CLOUD_PROJECT not set, cannot fetch from Secret Manager")
+            return None
+
+        try:
+            from google.cloud import secretmanager
+        except ImportError:
+            logger.log(failure_log_level, "Google Cloud Secret Manager library not available")
+            return None
+
+        client = None
+        try:
+            client = secretmanager.SecretManagerServiceClient()
+            secret_name = f"projects/{project_id}/secrets/{self.secret_id}/versions/latest"
+            response = client.access_secret_version(request={"name": secret_name})
+            logger.info(f"Retrieved secret '{self.secret_id}' from Secret Manager")
+            return response.payload.data.decode("UTF-8")
+        except Exception as e:
+            logger.log(
+                failure_log_level,
+                f"Could not fetch secret '{self.secret_id}' from Secret Manager: {type(e).__name__}"
+            )
+            return None
+        finally:
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+
+servicenow_password_secret = CachedSecret(SERVICENOW_PASSWORD_SECRET_ID)
@@ -5,9 +5,11 @@ import httpx
 import json
 import logging
 import asyncio
+import random
+import re
 from typing import Dict, Any, Optional, List, Union
 from urllib.parse import urljoin, quote
-from functools import wraps
+from functools import lru_cache, wraps
 import time
 
 from .secure_settings import SecureServiceNowSettings
@@ -22,6 +24,22 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Validation patterns compiled once; fullmatch rejects a trailing newline,
+# which '$' would let through
+_FIELD_NAME_RE = re.compile(r'[a-zA-Z0-9_.]+')
+_TABLE_NAME_RE = re.compile(r'[a-zA-Z0-9_]+')
+_SYS_ID_RE = re.compile(r'[a-f0-9]{32}')
+
+# ServiceNow uses these special characters in queries
+_SPECIAL_CHAR_ESCAPES = {
+    '^': '^^',
+    '=': '^=',
+    '>': '^>',
+    '<': '^<',
+    '!': '^!'
+}
+_SPECIAL_CHARS_RE = re.compile(r'[\^=><!]')
+
 
 class QueryBuilder:
     """Secure query builder to prevent injection attacks."""
@@ -42,9 +60,26 @@ class QueryBuilder:
         if not query:
             return ""
         
+        items = tuple(query.items())
+        try:
+            # Value types are part of the key so that e.g. True and 1 don't collide
+            return cls._build_query_cached(items, tuple(type(value) for _, value in items))
+        except TypeError:
+            # Unhashable values (e.g. lists) can't be cached
+            return cls._build_query_items(items)
+    
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _build_query_cached(cls, items: tuple, value_types: tuple) -> str:
+        """Build and memoize the query string for hashable query items."""
+        return cls._build_query_items(items)
+    
+    @classmethod
+    def _build_query_items(cls, items) -> str:
+        """Build the query string from (field, value) pairs."""
         query_parts = []
         
-        for key, value in query.items():
+        for key, value in items:
             # Validate field name
             if not cls._is_valid_field_name(key):
                 raise ServiceNowValidationError(f"Invalid field name: {key}")
@@ -70,27 +105,16 @@ class QueryBuilder:
     @staticmethod
     def _is_valid_field_name(field: str) -> bool:
         """Validate field name to prevent injection."""
-        import re
         # Allow alphanumeric, underscore, and dot (for nested fields)
-        return bool(re.match(r'^[a-zA-Z0-9_.]+$', field))
+        return _FIELD_NAME_RE.fullmatch(field) is not None
     
     @staticmethod
     def _escape_value(value: str) -> str:
         """Escape special characters in query values."""
-        # ServiceNow uses these special characters in queries
-        special_chars = {
-            '^': '^^',
-            '=': '^=',
-            '>': '^>',
-            '<': '^<',
-            '!': '^!'
-        }
-        
-        escaped = value
-        for char, replacement in special_chars.items():
-            escaped = escaped.replace(char, replacement)
-        
-        return escaped
+        # Most values have nothing to escape; return them without copying
+        if _SPECIAL_CHARS_RE.search(value) is None:
+            return value
+        return _SPECIAL_CHARS_RE.sub(lambda match: _SPECIAL_CHAR_ESCAPES[match.group()], value)
     
     @classmethod
     def _build_between_query(cls, field: str, value: str) -> str:
@@ -115,13 +139,33 @@ class QueryBuilder:
         raise ServiceNowValidationError(f"Invalid comparison format: {value}")
 
 
-def retry_with_backoff(max_retries: int = 3, initial_delay: float = 1.0):
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def retry_with_backoff(
+    max_retries: int = 3,
+    initial_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.5
+):
     """
     Decorator for retry logic with exponential backoff.
     
     Args:
         max_retries: Maximum number of retry attempts
         initial_delay: Initial delay between retries in seconds
+        max_delay: Upper bound on any single backoff delay in seconds; a
+            longer Retry-After from the server ends the retries instead
+        jitter: Maximum random fraction taken off each backoff delay so that
+            concurrent callers don't retry in lockstep, even at the cap; a
+            Retry-After wait is extended by up to jitter * initial_delay
     """
     def decorator(func):
         @wraps(func)
@@ -135,12 +179,26 @@ def retry_with_backoff(max_retries: int = 3, initial_delay: float = 1.0):
                 except (ServiceNowRateLimitError, ServiceNowTimeoutError, httpx.ConnectError) as e:
                     last_exception = e
                     if attempt < max_retries:
+                        # Prefer the server's Retry-After over our own estimate
+                        retry_after = e.retry_after if isinstance(e, ServiceNowRateLimitError) else None
+                        if retry_after is not None:
+                            if retry_after > max_delay:
+                                # Retrying before the cooldown ends only earns another 429
+                                logger.error(
+                                    f"Server asked to retry after {retry_after} seconds, "
+                                    f"longer than the {max_delay} second limit; giving up"
+                                )
+                                raise
+                            # Wait out the full cooldown, plus a little so callers spread out
+                            sleep_for = retry_after + random.random() * jitter * initial_delay
+                        else:
+                            sleep_for = min(max_delay, delay) * (1 - random.random() * jitter)
                         logger.warning(
                             f"Attempt {attempt + 1} failed: {e}. "
-                            f"Retrying in {delay} seconds..."
+                            f"Retrying in {sleep_for:.2f} seconds..."
                         )
-                        await asyncio.sleep(delay)
-                        delay *= 2  # Exponential backoff
+                        await asyncio.sleep(sleep_for)
+                        delay = min(max_delay, delay * 2)  # Exponential backoff
                     else:
                         logger.error(f"All {max_retries + 1} attempts failed")
                 except ServiceNowAuthenticationError:
@@ -169,14 +227,16 @@ class SecureServiceNowClient:
             "Accept": "application/json",
             "Content-Type": "application/json"
         }
+        # Lowercased once so table checks are a set lookup
+        self._allowed_tables = frozenset(t.lower() for t in settings.allowed_tables)
         
         # Create a shared client with connection pooling
         self._client = httpx.AsyncClient(
             timeout=httpx.Timeout(settings.api_timeout),
             limits=httpx.Limits(
-                max_keepalive_connections=5,
-                max_connections=10,
-                keepalive_expiry=30
+                max_keepalive_connections=settings.max_keepalive_connections,
+                max_connections=settings.max_connections,
+                keepalive_expiry=settings.keepalive_expiry
             ),
             auth=self.auth,
             headers=self.headers
@@ -217,18 +277,16 @@ class SecureServiceNowClient:
     @staticmethod
     def _is_valid_table_name(table: str) -> bool:
         """Validate table name format."""
-        import re
-        return bool(re.match(r'^[a-zA-Z0-9_]+$', table))
+        return _TABLE_NAME_RE.fullmatch(table) is not None
     
     @staticmethod
     def _is_valid_sys_id(sys_id: str) -> bool:
         """Validate sys_id format (32 character hex string)."""
-        import re
-        return bool(re.match(r'^[a-f0-9]{32}$', sys_id.lower()))
+        return _SYS_ID_RE.fullmatch(sys_id.lower()) is not None
     
     def _validate_table(self, table: str) -> bool:
         """Check if the table is in the allowed tables list."""
-        is_valid = table.lower() in [t.lower() for t in self.settings.allowed_tables]
+        is_valid = table.lower() in self._allowed_tables
         if not is_valid:
             logger.warning(f"Table '{table}' is not in allowed tables")
         return is_valid
@@ -241,7 +299,8 @@ class SecureServiceNowClient:
             )
         elif response.status_code == 429:
             raise ServiceNowRateLimitError(
-                f"Rate limit exceeded for {operation} operation"
+                f"Rate limit exceeded for {operation} operation",
+                retry_after=_parse_retry_after(response.headers.get("Retry-After"))
             )
         elif response.status_code == 408:
             raise ServiceNowTimeoutError(
@@ -5,8 +5,10 @@ from typing import Any, Optional, List, Union
 from pydantic_settings import BaseSettings
 from pydantic import Field, SecretStr, field_validator, validator
 import os
+import re
 import logging
-from contextlib import contextmanager
+
+from .secret_cache import servicenow_password_secret
 
 # Configure logger without exposing sensitive data
 logger = logging.getLogger(__name__)
@@ -15,6 +17,9 @@ logger.addFilter(lambda record: not any(
     for sensitive in ['password', 'secret', 'token', 'key']
 ))
 
+# Valid table names: alphanumeric and underscore only
+_TABLE_NAME_RE = re.compile(r'[a-zA-Z0-9_]+')
+
 
 class SecureServiceNowSettings(BaseSettings):
     """ServiceNow configuration with enhanced security."""
@@ -73,6 +78,29 @@ class SecureServiceNowSettings(BaseSettings):
         description="Initial retry delay in seconds"
     )
     
+    # Connection pool configuration
+    max_connections: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description=(
+            "Maximum concurrent connections to ServiceNow (1-1000); "
+            "higher values allow more parallel requests but use more sockets"
+        )
+    )
+    max_keepalive_connections: int = Field(
+        default=20,
+        ge=0,
+        le=1000,
+        description="Maximum idle connections kept open for reuse (0-1000)"
+    )
+    keepalive_expiry: float = Field(
+        default=60.0,
+        ge=1.0,
+        le=300.0,
+        description="Seconds an idle connection is kept before closing (1-300)"
+    )
+    
     def __init__(self, **kwargs):
         """Initialize with secure password retrieval."""
         super().__init__(**kwargs)
@@ -101,46 +129,9 @@ class SecureServiceNowSettings(BaseSettings):
             "environment variable or configure Secret Manager."
         )
     
-    @contextmanager
-    def _get_secret_manager_client(self):
-        """Context manager for Secret Manager client."""
-        from google.cloud import secretmanager
-        client = None
-        try:
-            client = secretmanager.SecretManagerServiceClient()
-            yield client
-        finally:
-            if client:
-                # Properly close the client to release resources
-                try:
-                    client.close()
-                except Exception as e:
-                    logger.debug(f"Error closing Secret Manager client: {e}")
-    
     def _fetch_from_secret_manager(self) -> Optional[str]:
-        """Fetch password from Google Secret Manager with proper resource management."""
-        try:
-            project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-            if not project_id:
-                logger.debug("GOOGLE_CLOUD_PROJECT not set")
-                return None
-            
-            with self._get_secret_manager_client() as client:
-                secret_name = f"projects/{project_id}/secrets/servicenow-password-prod/versions/latest"
-                
-                try:
-                    response = client.access_secret_version(request={"name": secret_name})
-                    return response.payload.data.decode("UTF-8")
-                except Exception as e:
-                    logger.debug(f"Secret Manager access failed: {type(e).__name__}")
-                    return None
-                    
-        except ImportError:
-            logger.debug("Google Cloud Secret Manager library not available")
-            return None
-        except Exception as e:
-            logger.debug(f"Unexpected error accessing Secret Manager: {type(e).__name__}")
-            return None
+        """Fetch password from Google Secret Manager (cached process-wide)."""
+        return servicenow_password_secret.get_secret()
     
     @field_validator('allowed_tables', mode='before')
     @classmethod
@@ -152,11 +143,8 @@ class SecureServiceNowSettings(BaseSettings):
             tables = v
         
         # Validate table names (alphanumeric and underscore only)
-        import re
-        valid_pattern = re.compile(r'^[a-zA-Z0-9_]+$')
-        
         for table in tables:
-            if not valid_pattern.match(table):
+            if _TABLE_NAME_RE.fullmatch(table) is None:
                 raise ValueError(
                     f"Invalid table name '{table}'. "
                     "Table names must contain only letters, numbers, and underscores."
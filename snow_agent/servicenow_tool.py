@@ -8,7 +8,7 @@ from google.adk.tools import FunctionTool
 from .servicenow_client import ServiceNowClient
 from .settings import ServiceNowSettings
 from .servicenow import CRUDRequest, CRUDResponse
-from .logging_config import LogContext, get_logger
+from .logging_config import LogContext, get_logger, lazy_log
 
 
 logger = get_logger(__name__)
@@ -17,7 +17,14 @@ logger = get_logger(__name__)
 def create_servicenow_tool(settings: ServiceNowSettings) -> FunctionTool:
     """Factory function to create a ServiceNow tool instance."""
     logger.info("Creating ServiceNow tool with configured settings")
-    client = ServiceNowClient(settings)
+    client: Optional[ServiceNowClient] = None
+    
+    def get_client() -> ServiceNowClient:
+        """Create the ServiceNow client on first tool invocation."""
+        nonlocal client
+        if client is None:
+            client = ServiceNowClient(settings)
+        return client
     
     async def servicenow_crud(
         operation: str,
@@ -80,7 +87,7 @@ def create_servicenow_tool(settings: ServiceNowSettings) -> FunctionTool:
                 if query:
                     logger.info(f"Query parameters: {query}")
                 if data:
-                    logger.info(f"Data payload: {json.dumps(data, indent=2)}")
+                    lazy_log(logger, logging.INFO, lambda: f"Data payload: {json.dumps(data, indent=2)}")
                 if fields:
                     logger.info(f"Requested fields: {fields}")
                 if limit:
@@ -105,7 +112,7 @@ def create_servicenow_tool(settings: ServiceNowSettings) -> FunctionTool:
                         logger.error("CREATE operation failed: missing required 'data' parameter")
                         raise ValueError("'data' is required for create operations")
                     logger.info(f"Executing CREATE operation on {request.table}")
-                    response = await client.create_record(
+                    response = await get_client().create_record(
                         table=request.table,
                         data=request.data,
                         fields=request.fields
@@ -113,7 +120,7 @@ def create_servicenow_tool(settings: ServiceNowSettings) -> FunctionTool:
                 
                 elif request.operation == "read":
                     logger.info(f"Executing READ operation on {request.table}")
-                    response = await client.read_records(
+                    response = await get_client().read_records(
                         table=request.table,
                         query=request.query,
                         fields=request.fields,
@@ -128,7 +135,7 @@ def create_servicenow_tool(settings: ServiceNowSettings) -> FunctionTool:
                         logger.error("UPDATE operation failed: missing required 'data' parameter")
                         raise ValueError("'data' is required for update operations")
                     logger.info(f"Executing UPDATE operation on {request.table} for sys_id: {request.sys_id}")
-                    response = await client.update_record(
+                    response = await get_client().update_record(
                         table=request.table,
                         sys_id=request.sys_id,
                         data=request.data,
@@ -140,7 +147,7 @@ def create_servicenow_tool(settings: ServiceNowSettings) -> FunctionTool:
                         logger.error("DELETE operation failed: missing required 'sys_id' parameter")
                         raise ValueError("'sys_id' is required for delete operations")
                     logger.info(f"Executing DELETE operation on {request.table} for sys_id: {request.sys_id}")
-                    response = await client.delete_record(
+                    response = await get_client().delete_record(
                         table=request.table,
                         sys_id=request.sys_id
                     )
@@ -155,7 +162,7 @@ def create_servicenow_tool(settings: ServiceNowSettings) -> FunctionTool:
                     if hasattr(response, 'count'):
                         logger.info(f"Records affected: {response.count}")
                     result = response.dict()
-                    logger.debug(f"Response data: {json.dumps(result, indent=2)}")
+                    lazy_log(logger, logging.DEBUG, lambda: f"Response data: {json.dumps(result, indent=2)}")
                     return result
                 else:
                     logger.error(f"Operation {request.operation.upper()} failed: {response.error}")
@@ -1,9 +1,12 @@
+from functools import lru_cache
 from typing import Any, Optional, List, Union
 from pydantic_settings import BaseSettings
 from pydantic import Field, SecretStr, field_validator
 import os
 import logging
 
+from .secret_cache import servicenow_password_secret
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,33 +44,8 @@ class ServiceNowSettings(BaseSettings):
                     raise ValueError("ServiceNow password not found in Secret Manager or environment variables")
     
     def _get_password_from_secret_manager(self) -> Optional[str]:
-        """Fetch password from Google Secret Manager."""
-        try:
-            from google.cloud import secretmanager
-            
-            # Get project ID from environment
-            project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-            if not project_id:
-                logger.warning("GOOGLE_CLOUD_PROJECT not set, cannot fetch from Secret Manager")
-                return None
-            
-            # Create the Secret Manager client
-            client = secretmanager.SecretManagerServiceClient()
-            
-            # Build the resource name of the secret
-            secret_name = f"projects/{project_id}/secrets/servicenow-password-prod/versions/latest"
-            
-            # Access the secret version
-            response = client.access_secret_version(request={"name": secret_name})
-            
-            # Return the decoded payload
-            password = response.payload.data.decode("UTF-8")
-            logger.info("Successfully retrieved ServiceNow password from Secret Manager")
-            return password
-            
-        except Exception as e:
-            logger.warning(f"Could not fetch password from Secret Manager: {e}")
-            return None
+        """Fetch password from Google Secret Manager (cached process-wide)."""
+        return servicenow_password_secret.get_secret(failure_log_level=logging.WARNING)
     
     # Tables configuration
     allowed_tables: Union[List[str], str] = Field(
@@ -127,3 +105,21 @@ class AgentSettings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
         extra = "ignore"  # Ignore extra fields from .env
+
+
+@lru_cache(maxsize=1)
+def get_servicenow_settings() -> ServiceNowSettings:
+    """Return the process-wide ServiceNow settings, loaded on first use.
+    
+    Call get_servicenow_settings.cache_clear() to reload from the environment.
+    """
+    return ServiceNowSettings()
+
+
+@lru_cache(maxsize=1)
+def get_agent_settings() -> AgentSettings:
+    """Return the process-wide agent settings, loaded on first use.
+    
+    Call get_agent_settings.cache_clear() to reload from the environment.
+    """
+    return AgentSettings()